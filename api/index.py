@@ -1,15 +1,34 @@
 from fastapi import FastAPI, Query
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, Response
 import sys
-import json
+import asyncio
 import re
+from collections import Counter
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional
-import pickle
+from typing import Iterable, Iterator, Optional, Sequence, Union
+import numpy as np
+import orjson
+
+try:
+    import numba
+    from numba import njit, prange
+    # Searches score concurrently from worker threads (asyncio.to_thread), and
+    # the fallback workqueue layer aborts when entered from several threads;
+    # only accept TBB or OpenMP (checked when the kernel is warmed up)
+    numba.config.THREADING_LAYER = 'threadsafe'
+except ImportError:  # optional speedup; the NumPy path below is used instead
+    njit = None
 import os
 import urllib.request
 import gzip
 import tempfile
+import shutil
+import multiprocessing
+import itertools
+from array import array
+import threading
 
 # Copy the query expansion code inline for Vercel
 POPULAR_SEARCHES = [
@@ -21,14 +40,51 @@ def expand_query(query: str) -> str:
     """Simple query expansion."""
     return query.lower().strip()
 
+def build_trigram_index(strings) -> dict[str, np.ndarray]:
+    """Map each trigram to the sorted positions of the strings containing it."""
+    positions_by_gram = {}
+    for i, string in enumerate(strings):
+        for gram in {string[j:j + 3] for j in range(len(string) - 2)}:
+            positions_by_gram.setdefault(gram, []).append(i)
+    return {gram: np.array(positions, dtype=np.int32) for gram, positions in positions_by_gram.items()}
+
+def substring_matches(needle: str, strings, trigrams: dict[str, np.ndarray]) -> list[int]:
+    """Positions of ``strings`` containing ``needle``, in ascending order.
+
+    Candidates come from intersecting the trigram postings of the needle, so
+    the substring check only runs on those instead of every string. Needles
+    shorter than a trigram fall back to a plain scan.
+    """
+    if len(needle) >= 3:
+        postings = sorted(
+            (trigrams.get(needle[j:j + 3], np.empty(0, dtype=np.int32)) for j in range(len(needle) - 2)),
+            key=len,
+        )
+        candidates = postings[0]
+        for positions in postings[1:]:
+            if not candidates.size:
+                break
+            candidates = np.intersect1d(candidates, positions, assume_unique=True)
+        candidates = candidates.tolist()
+    else:
+        candidates = range(len(strings))
+    return [i for i in candidates if needle in strings[i]]
+
+POPULAR_TRIGRAMS = build_trigram_index(POPULAR_SEARCHES)
+
 def get_search_suggestions(partial: str, limit: int = 5) -> list[str]:
     """Get search suggestions."""
-    partial = partial.lower()
-    suggestions = [s for s in POPULAR_SEARCHES if partial in s]
-    return suggestions[:limit]
+    matches = substring_matches(partial.lower(), POPULAR_SEARCHES, POPULAR_TRIGRAMS)
+    return [POPULAR_SEARCHES[i] for i in matches[:limit]]
+
+class ORJSONResponse(JSONResponse):
+    """JSON response rendered with orjson (compact, UTF-8, no ASCII escaping)."""
+
+    def render(self, content) -> bytes:
+        return orjson.dumps(content)
 
 # Initialize FastAPI
-app = FastAPI()
+app = FastAPI(default_response_class=ORJSONResponse)
 
 app.add_middleware(
     CORSMiddleware,
@@ -43,19 +99,24 @@ BASE_DIR = Path(__file__).resolve().parent
 REPO_ROOT = BASE_DIR.parent
 DATA_PATH = BASE_DIR / "papers_data.json"
 
-# Load papers data (normalize fields so both db-export and original JSON work)
-PAPERS = []
-PAPERS_BY_ID = {}
+# Load papers data (normalize fields so both db-export and original JSON work).
+# Papers are stored column-wise: one object array per field, aligned by row.
+# Response dicts are only materialised for the rows actually returned.
+PAPER_FIELDS = ('id', 'title', 'abstract', 'authors', 'categories', 'category',
+                'published', 'updated', 'url', 'pdf_url')
+PAPER_COLUMNS = {field: np.empty(0, dtype=object) for field in PAPER_FIELDS}
+AUTHORS_LC = np.empty(0, dtype=object)
+N_PAPERS = 0
+CATEGORY_SPLIT_RE = re.compile(r"[\s,]+")
 
 def load_papers_data():
     """Load papers data from local file or download from external storage."""
-    global PAPERS, PAPERS_BY_ID
+    global PAPER_COLUMNS, AUTHORS_LC, AUTHOR_TRIGRAMS, N_PAPERS
     
     # Try to load from local file first
     if DATA_PATH.exists():
         print(f"Loading papers from local file: {DATA_PATH}...")
-        with open(DATA_PATH, 'r', encoding='utf-8') as f:
-            raw = json.load(f)
+        raw = orjson.loads(DATA_PATH.read_bytes())
     else:
         # Try to download from external storage
         PAPERS_DATA_URL = os.environ.get('PAPERS_DATA_URL')
@@ -70,18 +131,16 @@ def load_papers_data():
                 
                 # Check if it's compressed
                 try:
-                    with gzip.open(tmp_path, 'rt', encoding='utf-8') as f:
-                        raw = json.load(f)
+                    with gzip.open(tmp_path, 'rb') as f:
+                        raw = orjson.loads(f.read())
                     print("Loaded compressed JSON file")
                 except (gzip.BadGzipFile, OSError):
                     # Not compressed, try as regular JSON
-                    with open(tmp_path, 'r', encoding='utf-8') as f:
-                        raw = json.load(f)
+                    raw = orjson.loads(Path(tmp_path).read_bytes())
                     print("Loaded uncompressed JSON file")
                 
                 # Save locally for future use
-                with open(DATA_PATH, 'w', encoding='utf-8') as f:
-                    json.dump(raw, f, ensure_ascii=False, separators=(',', ':'))
+                DATA_PATH.write_bytes(orjson.dumps(raw))
                 print(f"Saved to {DATA_PATH} for future use")
                 
                 # Clean up temp file
@@ -95,6 +154,7 @@ def load_papers_data():
             return
     
     # Process papers
+    rows = []
     for item in raw:
         pid = item.get('paper_id') or item.get('id') or item.get('paperId')
         if not pid:
@@ -105,72 +165,641 @@ def load_papers_data():
         primary = item.get('primary_category') or item.get('category') or ''
         if not primary and categories:
             # categories may be comma or space separated
-            cats = [c.strip() for c in re.split(r"[\s,]+", categories) if c.strip()]
+            cats = [c.strip() for c in CATEGORY_SPLIT_RE.split(categories) if c.strip()]
             primary = cats[0] if cats else ''
+        # The same few category strings repeat across thousands of papers;
+        # interning keeps one copy of each instead of one per paper
+        if isinstance(categories, str):
+            categories = sys.intern(categories)
+        if isinstance(primary, str):
+            primary = sys.intern(primary)
+
+        rows.append((
+            pid,
+            item.get('title', ''),
+            item.get('abstract', ''),
+            item.get('authors', ''),
+            categories,
+            primary,
+            item.get('published', ''),
+            item.get('updated', ''),
+            item.get('url') or item.get('html_url') or item.get('link'),
+            item.get('pdf_url') or item.get('pdf') or ''
+        ))
+
+    N_PAPERS = len(rows)
+    for field, values in zip(PAPER_FIELDS, zip(*rows) if rows else [()] * len(PAPER_FIELDS)):
+        column = np.empty(N_PAPERS, dtype=object)
+        column[:] = values
+        PAPER_COLUMNS[field] = column
+    AUTHORS_LC = np.array([(a or '').lower() for a in PAPER_COLUMNS['authors']], dtype=object)
+    AUTHOR_TRIGRAMS = None
+    paper_json.cache_clear()
+    print(f"Loaded {N_PAPERS} papers")
+
+def paper_at(row: int) -> dict:
+    """Materialise the response dict for one paper row."""
+    return {field: PAPER_COLUMNS[field][row] for field in PAPER_FIELDS}
 
-        paper = {
-            'id': pid,
-            'title': item.get('title', ''),
-            'abstract': item.get('abstract', ''),
-            'authors': item.get('authors', ''),
-            'categories': categories,
-            'category': primary,
-            'published': item.get('published', ''),
-            'updated': item.get('updated', ''),
-            'url': item.get('url') or item.get('html_url') or item.get('link'),
-            'pdf_url': item.get('pdf_url') or item.get('pdf') or ''
-        }
-        PAPERS.append(paper)
-
-    PAPERS_BY_ID = {p['id']: p for p in PAPERS if p.get('id')}
-    print(f"Loaded {len(PAPERS)} papers")
+@lru_cache(maxsize=4096)
+def paper_json(row: int) -> bytes:
+    """Serialised paper_at(row); popular papers are encoded once, not per response."""
+    return orjson.dumps(paper_at(row))
+
+def json_response(body: bytes) -> Response:
+    """Response for an already-serialised JSON body."""
+    return Response(body, media_type="application/json")
+
+# Per-row filter columns, aligned with PAPER_COLUMNS
+YEARS = np.zeros(0, dtype=np.int16)
+CAT_IDX = {}
+# Pre-rendered JSON bodies of /stats and /facets
+STATS_RESPONSE = b'{}'
+FACETS_RESPONSE = b'{}'
+
+def parse_year(published: str) -> int:
+    """Year from an ISO date string, or -1 if it cannot be parsed."""
+    year = (published or '')[:4]
+    return int(year) if year.isascii() and year.isdigit() else -1
+
+def build_filter_index():
+    """Precompute the year column and per-category row lists for filtering."""
+    global YEARS, CAT_IDX
+    YEARS = np.fromiter(map(parse_year, PAPER_COLUMNS['published']), dtype=np.int16, count=N_PAPERS)
+    rows_by_cat = {}
+    for i, cat in enumerate(PAPER_COLUMNS['category']):
+        if cat:
+            rows_by_cat.setdefault(cat, []).append(i)
+    CAT_IDX = {cat: np.array(rows, dtype=np.int64) for cat, rows in rows_by_cat.items()}
+    build_summary_responses()
+
+def known_year_range() -> list[int]:
+    """[min, max] publication year over papers with a known year."""
+    known = YEARS[YEARS >= 0]
+    return [int(known.min()), int(known.max())] if known.size else [2000, 2024]
+
+def build_summary_responses():
+    """Precompute the /stats and /facets payloads; papers are static between loads."""
+    global STATS_RESPONSE, FACETS_RESPONSE
+    if not N_PAPERS:
+        STATS_RESPONSE = orjson.dumps({"total_papers": 0, "categories": {}, "year_range": [0, 0]})
+        FACETS_RESPONSE = orjson.dumps({"categories": [], "year_range": [2000, 2024]})
+        return
+    year_range = known_year_range()
+    STATS_RESPONSE = orjson.dumps({
+        "total_papers": N_PAPERS,
+        "categories": {cat: len(rows) for cat, rows in CAT_IDX.items()},
+        "year_range": year_range
+    })
+    FACETS_RESPONSE = orjson.dumps({
+        "categories": sorted(CAT_IDX),
+        "year_range": year_range
+    })
+
+# Trigram -> sorted rows whose lowercased authors contain it; built on first
+# use (it takes seconds on a large corpus, so not on every cold start). The
+# lock makes concurrent first requests wait for one build instead of each
+# doing their own.
+AUTHOR_TRIGRAMS = None
+AUTHOR_TRIGRAMS_LOCK = threading.Lock()
+
+def author_rows(author: str) -> np.ndarray:
+    """Rows whose authors contain ``author`` (case-insensitive substring)."""
+    global AUTHOR_TRIGRAMS
+    if AUTHOR_TRIGRAMS is None:
+        with AUTHOR_TRIGRAMS_LOCK:
+            if AUTHOR_TRIGRAMS is None:
+                AUTHOR_TRIGRAMS = build_trigram_index(AUTHORS_LC)
+    return np.array(substring_matches(author.lower(), AUTHORS_LC, AUTHOR_TRIGRAMS), dtype=np.int64)
+
+def filter_rows(category: Optional[str], year_min: Optional[int], year_max: Optional[int],
+                author: Optional[str]) -> Optional[np.ndarray]:
+    """Rows of papers passing the category/year/author filters, or None if none are set."""
+    if not (category or year_min or year_max or author):
+        return None
+    if year_min or year_max:
+        mask = YEARS >= 0
+        if year_min:
+            mask &= YEARS >= year_min
+        if year_max:
+            mask &= YEARS <= year_max
+    else:
+        mask = np.ones(N_PAPERS, dtype=bool)
+    if category:
+        in_category = np.zeros(N_PAPERS, dtype=bool)
+        in_category[CAT_IDX.get(category, [])] = True
+        mask &= in_category
+    if author:
+        by_author = np.zeros(N_PAPERS, dtype=bool)
+        by_author[author_rows(author)] = True
+        mask &= by_author
+    return np.flatnonzero(mask)
 
 # Load papers on startup
 load_papers_data()
+build_filter_index()
+
+# A token is a maximal run of word characters and hyphens, at least 3 long
+TOKEN_RE = re.compile(r'[\w-]{3,}')
 
-def tokenize(text: str) -> list[str]:
-    """Enhanced tokenization for academic text."""
+@lru_cache(maxsize=4096)
+def tokenize(text: str) -> tuple[str, ...]:
+    """Enhanced tokenization for academic text.
+
+    Cached, since queries repeat heavily; returns a tuple so cached results
+    can be shared safely between callers.
+    """
     if not text:
-        return []
-    text = text.lower()
-    text = re.sub(r'[^\w\s-]', ' ', text)
-    tokens = [t for t in text.split() if len(t) > 2]
-    return tokens
+        return ()
+    return tuple(TOKEN_RE.findall(text.lower()))
+
+def top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the ``k`` highest scores, best first, ties in index order.
+
+    Only the top ``k`` are selected with a partial partition and sorted.
+    """
+    n = scores.size
+    k = min(k, n)
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    kth = np.partition(scores, n - k)[n - k]
+    above = np.flatnonzero(scores > kth)
+    tied = np.flatnonzero(scores == kth)[:k - above.size]
+    top = np.concatenate([above, tied])
+    return top[np.lexsort((top, -scores[top]))]
+
+if njit is not None:
+    # The compiled kernel is cached on disk so later process starts skip the
+    # JIT. Numba caches next to this file by default; serverless hosts mount
+    # the code read-only, so use a temp dir there unless NUMBA_CACHE_DIR is set.
+    if not os.environ.get('NUMBA_CACHE_DIR') and not os.access(Path(__file__).resolve().parent, os.W_OK):
+        numba.config.CACHE_DIR = os.path.join(tempfile.gettempdir(), 'numba_cache')
+
+    # No fastmath: fused multiply-adds would round differently from the NumPy
+    # lookups get_top_k() uses for non-essential terms
+    @njit(parallel=True, cache=True)
+    def bm25_accumulate(scores, term_ids, weights, offsets, post_docs, post_quant, term_scale):
+        """Add each term's weighted, dequantised BM25 postings into ``scores`` in place.
+
+        Terms run one after another; a term's postings are split across
+        threads, which is race-free because doc ids are unique within a term.
+        """
+        for i in range(term_ids.size):
+            t = term_ids[i]
+            w = weights[i] * term_scale[t]
+            for j in prange(offsets[t], offsets[t + 1]):
+                scores[post_docs[j]] += w * post_quant[j]
+
+else:
+    bm25_accumulate = None
+
+class BM25Index:
+    """Okapi BM25 with eagerly precomputed, Structure-of-Arrays postings.
+
+    A term's contribution to a document depends only on the term and the
+    document, so it is computed once at build time:
+    ``idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * dl / avgdl))``.
+    Postings of all terms live in two flat arrays (``post_docs`` as int32 and
+    ``post_quant`` as int16) sliced per term by ``offsets``; scoring a query
+    is just a gather-add of its terms' postings.
+
+    Contributions are quantised per term to int16 against the term's largest
+    one (``term_scale = max / QUANT_MAX``), halving the bytes scoring streams
+    through. The rounding error is at most half a step, i.e. about 1.5e-5 of
+    the term's maximum contribution.
+    """
+
+    ARRAYS = ('offsets', 'post_docs', 'post_tfs', 'doc_len', 'post_quant', 'term_scale')
+    QUANT_MAX = 32767
+
+    def __init__(self, corpus: Iterable[Union[Sequence[str], int]], k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.vocab = {}
+        self._build(*self._count(corpus, first_doc=0))
+
+    def extended(self, corpus: Iterable[Union[Sequence[str], int]]) -> "BM25Index":
+        """A new index over this index's documents followed by ``corpus``.
+
+        Only the new documents are counted; the existing postings are merged
+        in as they are. Every score is still recomputed (from the stored term
+        frequencies), since idf and the average length change with the corpus.
+        """
+        index = BM25Index.__new__(BM25Index)
+        index.k1 = self.k1
+        index.b = self.b
+        index.vocab = dict(self.vocab)
+        new_terms, new_docs, new_tfs, new_len = index._count(corpus, first_doc=self.n_docs)
+        old_terms = np.repeat(np.arange(len(self.vocab), dtype=np.int32), np.diff(self.offsets))
+        # A stable sort by term keeps each term's old docs ahead of the new ones
+        term_ids = np.concatenate([old_terms, new_terms])
+        order = np.argsort(term_ids, kind='stable')
+        index._build(
+            term_ids[order],
+            np.concatenate([self.post_docs, new_docs])[order],
+            np.concatenate([self.post_tfs, new_tfs])[order],
+            np.concatenate([self.doc_len, new_len]),
+        )
+        return index
+
+    def _count(self, corpus: Iterable[Union[Sequence[str], int]], first_doc: int):
+        """Term ids, doc ids and tfs of the corpus's postings, plus document lengths.
+
+        ``corpus`` yields each document's tokens, or for a repeat of an earlier
+        document that document's position in ``corpus``. Tokens are mapped to
+        term ids as each document arrives, so no token strings are kept.
+        Postings come out sorted by term, then doc; new terms are added to
+        ``self.vocab`` in order of first appearance.
+        """
+        # The corpus as one packed array of int32 term ids, so postings can be
+        # built with NumPy rather than per-doc Counters
+        vocab = self.vocab
+        tokens = array('i')
+        starts = array('q', [0])
+        for doc in corpus:
+            if isinstance(doc, int):
+                tokens.extend(tokens[starts[doc]:starts[doc + 1]])
+            else:
+                tokens.extend([vocab.setdefault(t, len(vocab)) for t in doc])
+            starts.append(len(tokens))
+        n_docs = len(starts) - 1
+        doc_len = np.diff(np.frombuffer(starts, dtype=np.int64)).astype(np.int32)
+
+        # Distinct (term, doc) pairs sorted by term then doc; run lengths are the
+        # tfs. Only this transient key needs 64 bits, and it is sorted in place.
+        n = max(n_docs, 1)
+        keys = np.frombuffer(tokens, dtype=np.int32).astype(np.int64)
+        del tokens
+        keys *= n
+        keys += np.repeat(np.arange(n_docs, dtype=np.int32), doc_len)
+        keys.sort()
+        run_start = np.ones(keys.size, dtype=bool)
+        np.not_equal(keys[1:], keys[:-1], out=run_start[1:])
+        firsts = np.flatnonzero(run_start)
+        del run_start
+        tfs = np.diff(firsts, append=keys.size).astype(np.int32)
+        pairs = keys[firsts]
+        del keys, firsts
+        doc_ids = (pairs % n + first_doc).astype(np.int32)
+        pairs //= n
+        return pairs.astype(np.int32), doc_ids, tfs, doc_len
+
+    def _build(self, term_ids: np.ndarray, doc_ids: np.ndarray, tfs: np.ndarray, doc_len: np.ndarray):
+        """Lay out postings (sorted by term, then doc) and precompute their scores."""
+        self.n_docs = doc_len.size
+        df = np.bincount(term_ids, minlength=len(self.vocab))
+        self.offsets = np.zeros(len(self.vocab) + 1, dtype=np.int64)
+        np.cumsum(df, out=self.offsets[1:])
+        self.post_docs = doc_ids.astype(np.int32)
+        # Kept so the index can be extended without re-tokenizing
+        self.post_tfs = tfs.astype(np.int32)
+        self.doc_len = doc_len.astype(np.int32)
+
+        # Lucene-style idf: always positive, unlike rank_bm25's epsilon floor
+        idf = np.log1p((self.n_docs - df + 0.5) / (df + 0.5)).astype(np.float32)
+        dl = self.doc_len.astype(np.float32)
+        avgdl = float(dl.mean()) if self.n_docs and dl.any() else 1.0
+        doc_len_norm = (1 - self.b + self.b * dl / avgdl).astype(np.float32)
+        tfs = self.post_tfs.astype(np.float32)
+        k1 = np.float32(self.k1)
+        post_scores = (
+            np.repeat(idf, df) * tfs * (k1 + 1) / (tfs + k1 * doc_len_norm[self.post_docs])
+        ).astype(np.float32)
+
+        max_contrib = np.zeros(len(self.vocab), dtype=np.float32)
+        if len(self.vocab):
+            max_contrib = np.maximum.reduceat(post_scores, self.offsets[:-1])
+        self.term_scale = (max_contrib / self.QUANT_MAX).astype(np.float32)
+        quant = np.rint(post_scores / np.repeat(self.term_scale, df))
+        self.post_quant = np.minimum(quant, self.QUANT_MAX).astype(np.int16)
+
+        # Same read-only layout as a memory-mapped index (one Numba specialisation)
+        for name in self.ARRAYS:
+            getattr(self, name).flags.writeable = False
+
+    def _accumulate(self, scores: np.ndarray, term_ids: list[int], weights: list[int]):
+        """Add the full postings of ``term_ids`` (times ``weights``) into ``scores``."""
+        if bm25_accumulate is not None:
+            bm25_accumulate(
+                scores, np.array(term_ids, dtype=np.int64), np.array(weights, dtype=np.float32),
+                self.offsets, self.post_docs, self.post_quant, self.term_scale,
+            )
+            return
+        for term_id, weight in zip(term_ids, weights):
+            docs, quant = self._postings(term_id)
+            # docs are unique within a posting list, so fancy += is safe here
+            scores[docs] += quant * self._step(term_id, weight)
+
+    def _postings(self, term_id: int) -> tuple[np.ndarray, np.ndarray]:
+        start, end = self.offsets[term_id], self.offsets[term_id + 1]
+        return self.post_docs[start:end], self.post_quant[start:end]
+
+    def _step(self, term_id: int, weight: int) -> np.float32:
+        """Score of one quantisation step of ``term_id``, times the query weight."""
+        return np.float32(weight) * self.term_scale[term_id]
+
+    def _bound(self, term_id: int) -> float:
+        """Largest (dequantised) contribution ``term_id`` makes to any document."""
+        return float(self.term_scale[term_id]) * self.QUANT_MAX
+
+    def get_scores(self, query_terms: dict[str, int]) -> np.ndarray:
+        """Return the BM25 score of every document for the query.
+
+        ``query_terms`` maps each distinct query term to its count; BM25 is
+        linear in the query term frequency, so a repeated term walks its
+        postings once with its contribution scaled by the count.
+        """
+        scores = np.zeros(self.n_docs, dtype=np.float32)
+        terms = self._terms(query_terms)
+        self._accumulate(scores, [t for t, _ in terms], [c for _, c in terms])
+        return scores
+
+    def _terms(self, query_terms: dict[str, int]) -> list[tuple[int, int]]:
+        """(term id, count) of the indexed query terms, largest bound first.
+
+        get_scores() and get_top_k() add terms in this same order, so float32
+        rounding, and with it the order of near-ties, is the same in both.
+        """
+        return sorted(
+            ((self.vocab[t], c) for t, c in query_terms.items() if t in self.vocab),
+            key=lambda tc: -self._bound(tc[0]) * tc[1],
+        )
+
+    def get_top_k(self, query_terms: dict[str, int], k: int) -> np.ndarray:
+        """Indices of the ``k`` best documents for the query, best first.
+
+        MaxScore pruning: terms are scored in decreasing order of their
+        maximum contribution. Once the running k-th best score beats the most
+        the unscored terms could still add, no unseen document can reach the
+        top k, so the remaining terms are only looked up for the documents
+        still in contention rather than scattered over their whole postings.
+        Returns the same ranking as ``top_k_indices(get_scores(...), k)``.
+        """
+        terms = self._terms(query_terms)
+        # Slightly inflated so float32 accumulation error can never break the bound
+        bounds = [self._bound(t) * c * (1 + 1e-4) for t, c in terms]
+        remaining = [sum(bounds[i:]) for i in range(len(terms) + 1)]
+        k = min(k, self.n_docs)
+        if not k:
+            return np.empty(0, dtype=np.int64)
+
+        # theta is a running lower bound on the final k-th best score: scores
+        # only grow, so the k-th best of any subset of partial scores will do.
+        scores = np.zeros(self.n_docs, dtype=np.float32)
+        theta = 0.0
+        for i, (term_id, count) in enumerate(terms):
+            self._accumulate(scores, [term_id], [count])
+            docs = self._postings(term_id)[0]
+            touched = scores[docs] if docs.size >= k else scores
+            theta = max(theta, float(np.partition(touched, touched.size - k)[touched.size - k]))
+            if theta > remaining[i + 1]:
+                break
+        else:
+            return top_k_indices(scores, k)
+
+        # Only documents that can still reach theta need the remaining terms
+        candidates = np.flatnonzero(scores + np.float32(remaining[i + 1]) >= theta)
+        for j in range(i + 1, len(terms)):
+            term_id, count = terms[j]
+            docs, quant = self._postings(term_id)
+            pos = np.minimum(np.searchsorted(docs, candidates), docs.size - 1)
+            hit = docs[pos] == candidates
+            scores[candidates[hit]] += quant[pos[hit]] * self._step(term_id, count)
+            if candidates.size > k:
+                # Tighten theta and drop documents that can no longer catch up
+                partial = scores[candidates]
+                theta = max(theta, float(np.partition(partial, partial.size - k)[partial.size - k]))
+                candidates = candidates[partial + np.float32(remaining[j + 1]) >= theta]
+        return candidates[top_k_indices(scores[candidates], k)]
+
+    def save(self, path: Path, doc_ids: list[str]):
+        """Write the index as one raw .npy per array plus a small meta.json.
+
+        The old meta.json is removed first and the new one written last, so
+        an interrupted save leaves a directory that is never loaded.
+        """
+        path.mkdir(parents=True, exist_ok=True)
+        (path / 'meta.json').unlink(missing_ok=True)
+        for stale in path.glob('*.npy'):
+            if stale.stem not in self.ARRAYS:
+                stale.unlink()
+        for name in self.ARRAYS:
+            # Replaced rather than overwritten in place: when extending a loaded
+            # index, the old file is still memory-mapped
+            tmp = path / f"{name}.npy.tmp"
+            with open(tmp, 'wb') as f:
+                np.save(f, getattr(self, name))
+            os.replace(tmp, path / f"{name}.npy")
+        terms = sorted(self.vocab, key=self.vocab.get)
+        meta = {'k1': self.k1, 'b': self.b, 'terms': terms, 'doc_ids': doc_ids}
+        (path / 'meta.json').write_bytes(orjson.dumps(meta))
+
+    @classmethod
+    def load(cls, path: Path) -> tuple["BM25Index", list[str]]:
+        """Memory-map an index written by save(); returns it with its doc ids.
+
+        Arrays are mapped read-only, so pages are only read from disk when a
+        query touches them and are shared between worker processes.
+        """
+        meta = orjson.loads((path / 'meta.json').read_bytes())
+        index = cls.__new__(cls)
+        index.k1 = meta['k1']
+        index.b = meta['b']
+        index.vocab = {term: i for i, term in enumerate(meta['terms'])}
+        for name in cls.ARRAYS:
+            setattr(index, name, np.load(path / f"{name}.npy", mmap_mode='r'))
+        index.n_docs = len(meta['doc_ids'])
+        # The scoring kernel does no bounds checks, so arrays from different
+        # saves must never be combined
+        n_postings = int(index.offsets[-1]) if index.offsets.size else -1
+        if (index.offsets.size != len(index.vocab) + 1
+                or index.term_scale.size != len(index.vocab)
+                or index.doc_len.size != index.n_docs
+                or not index.post_docs.size == index.post_tfs.size == index.post_quant.size == n_postings):
+            raise ValueError(f"inconsistent BM25 index arrays in {path}")
+        return index, meta['doc_ids']
+
 
 # Try to load a prebuilt BM25 index to avoid rebuilding on cold start.
 BM25 = None
-DOC_IDS = None
-BM25_PKL = REPO_ROOT / 'app' / 'bm25.pkl'
-if BM25_PKL.exists():
+BM25_DIR = REPO_ROOT / 'app' / 'bm25'
+# Serverless hosts (e.g. Vercel) mount the code read-only: an index built
+# there could not be saved, so every cold start would rebuild it. Such hosts
+# only get an index from BM25_URL, unpacked into the temp dir.
+BM25_PERSISTENT = os.access(REPO_ROOT, os.W_OK)
+if not BM25_PERSISTENT and not (BM25_DIR / 'meta.json').exists():
+    BM25_DIR = Path(tempfile.gettempdir()) / 'bm25'
+
+def load_bm25_index(path: Path) -> bool:
+    """Load a BM25 index directory written by build_bm25_index().
+
+    An index built before more papers were appended is brought up to date by
+    indexing only the new papers.
+    """
+    global BM25
     try:
-        with open(BM25_PKL, 'rb') as f:
-            data = pickle.load(f)
-        DOC_IDS = data.get('doc_ids')
-        BM25 = data.get('bm25')
-        print(f"Loaded BM25 index from {BM25_PKL} (docs: {len(DOC_IDS)})")
+        index, doc_ids = BM25Index.load(path)
     except Exception as e:
-        print(f"Failed to load BM25 pickle: {e}")
-        BM25 = None
-        DOC_IDS = None
+        print(f"Failed to load BM25 index: {e}")
+        return False
+    # Rows are addressed by position, so the index must match the papers exactly
+    paper_ids = PAPER_COLUMNS['id'].tolist()
+    if doc_ids == paper_ids:
+        BM25 = index
+        return True
+    if len(doc_ids) < len(paper_ids) and doc_ids == paper_ids[:len(doc_ids)]:
+        print(f"BM25 index is missing the {len(paper_ids) - len(doc_ids)} newest papers; indexing them")
+        try:
+            build_bm25_index(base=index)
+        except Exception as e:
+            print(f"Failed to extend BM25 index ({e}); it will be rebuilt")
+            return False
+        return BM25 is not None
+    print("BM25 index does not match the loaded papers; it will be rebuilt")
+    return False
+
+@lru_cache(maxsize=1024)
+def rank_rows(query_tokens: tuple[str, ...], category: Optional[str], year_min: Optional[int],
+              year_max: Optional[int], author: Optional[str], limit: int) -> tuple[int, ...]:
+    """Paper rows of the best BM25 matches passing the filters, best first.
+
+    Cached: scores are deterministic and papers are immutable between index
+    builds, and search traffic is dominated by a few popular queries. Callers
+    pass normalised arguments so equivalent requests share an entry.
+    """
+    query_terms = Counter(query_tokens)
+    rows = filter_rows(category, year_min, year_max, author)
+    if rows is None:
+        # Unfiltered: MaxScore can prune the posting walk
+        top = BM25.get_top_k(query_terms, limit)
+    else:
+        top = rows[top_k_indices(BM25.get_scores(query_terms)[rows], limit)]
+    # BM25 rows are aligned with the paper rows
+    return tuple(top.tolist())
+
+def tokenize_texts(texts: Iterable[str], n_texts: int) -> Iterator[Sequence[str]]:
+    """Lazily tokenize ``n_texts`` documents, spread over all CPU cores when there are several.
+
+    Workers are forked, which must happen before Numba starts its thread pool
+    (see the warm-up below). Falls back to a single process where pools cannot
+    be created (e.g. serverless runtimes without /dev/shm) or fork is
+    unavailable.
+    """
+    workers = os.cpu_count() or 1
+    if workers > 1 and n_texts >= 10000 and 'fork' in multiprocessing.get_all_start_methods():
+        try:
+            pool = multiprocessing.get_context('fork').Pool(workers)
+        except OSError as e:
+            print(f"Parallel tokenization unavailable ({e}); using one process")
+        else:
+            # Workers get TOKEN_RE.findall rather than tokenize: this runs while
+            # the module is still being imported, and unpickling a reference to
+            # one of its functions in a worker would block on the import lock.
+            # Texts go out in batches (two chunks per worker) so only one
+            # batch of token lists is held at a time.
+            with pool:
+                while batch := [text.lower() for text in itertools.islice(texts, 2 * 512 * workers)]:
+                    yield from pool.map(TOKEN_RE.findall, batch, chunksize=512)
+            return
+    # Uncached: documents would only evict the queries tokenize() caches
+    for text in texts:
+        yield tokenize.__wrapped__(text)
+
+def tokenize_corpus(titles: Sequence[str], abstracts: Sequence[str]) -> Iterator[Union[Sequence[str], int]]:
+    """Lazily tokenize each paper's title and abstract, in the BM25Index corpus format.
+
+    A paper repeating an earlier one's title and abstract (e.g. a re-posted
+    abstract) is tokenized once: it yields the earlier paper's position instead.
+    """
+    first_row = {}
+    repeat_of = [first_row.setdefault(doc, row) for row, doc in enumerate(zip(titles, abstracts))]
+    distinct = [row for row, first in enumerate(repeat_of) if first == row]
+    del first_row
+    docs = tokenize_texts((f"{titles[row]} {abstracts[row]}" for row in distinct), len(distinct))
+    for row, first in enumerate(repeat_of):
+        yield next(docs) if first == row else first
+
+def build_bm25_index(base: Optional[BM25Index] = None):
+    """Build the BM25 index from the loaded papers and cache it to BM25_DIR.
+
+    With ``base`` (an index over the first papers), only the papers after
+    those are tokenized and added to it.
+    """
+    global BM25
+    if not N_PAPERS:
+        return
+    start = base.n_docs if base is not None else 0
+    print(f"Building BM25 index over {N_PAPERS - start} papers...")
+    tokenize.cache_clear()
+    rank_rows.cache_clear()
+    corpus = tokenize_corpus(PAPER_COLUMNS['title'][start:], PAPER_COLUMNS['abstract'][start:])
+    BM25 = base.extended(corpus) if base is not None else BM25Index(corpus)
+    try:
+        BM25.save(BM25_DIR, PAPER_COLUMNS['id'].tolist())
+        print(f"Saved BM25 index to {BM25_DIR}")
+    except OSError as e:
+        print(f"Could not cache BM25 index: {e}")
+
+if (BM25_DIR / 'meta.json').exists():
+    if load_bm25_index(BM25_DIR):
+        print(f"Loaded BM25 index from {BM25_DIR} (docs: {BM25.n_docs})")
 else:
-    # Try to download BM25 from a URL if provided in environment (useful for Vercel)
+    # Try to download BM25 from a URL if provided in environment (useful for Vercel).
+    # The URL must point to a .tar.gz of the app/bm25 directory.
     BM25_URL = os.environ.get('BM25_URL')
     if BM25_URL:
         try:
             print(f"Downloading BM25 from {BM25_URL}...")
-            BM25_PKL.parent.mkdir(parents=True, exist_ok=True)
-            urllib.request.urlretrieve(BM25_URL, BM25_PKL)
-            with open(BM25_PKL, 'rb') as f:
-                data = pickle.load(f)
-            DOC_IDS = data.get('doc_ids')
-            BM25 = data.get('bm25')
-            print(f"Downloaded and loaded BM25 (docs: {len(DOC_IDS)})")
+            with tempfile.NamedTemporaryFile(delete=False, suffix='.tar.gz') as tmp:
+                urllib.request.urlretrieve(BM25_URL, tmp.name)
+                tmp_path = tmp.name
+            # Unpack next to the live directory, with tar's 'data' filter so
+            # members cannot escape it, and only swap it in once complete
+            BM25_DIR.parent.mkdir(parents=True, exist_ok=True)
+            unpack_dir = Path(tempfile.mkdtemp(dir=BM25_DIR.parent))
+            try:
+                shutil.unpack_archive(tmp_path, unpack_dir, format='gztar', filter='data')
+                if not (unpack_dir / BM25_DIR.name / 'meta.json').is_file():
+                    raise ValueError(f"archive has no {BM25_DIR.name}/meta.json")
+                shutil.rmtree(BM25_DIR, ignore_errors=True)
+                os.replace(unpack_dir / BM25_DIR.name, BM25_DIR)
+            finally:
+                shutil.rmtree(unpack_dir, ignore_errors=True)
+                os.unlink(tmp_path)
+            if load_bm25_index(BM25_DIR):
+                print(f"Downloaded and loaded BM25 (docs: {BM25.n_docs})")
         except Exception as e:
             print(f"Failed to download BM25: {e}")
-            BM25 = None
-            DOC_IDS = None
-    else:
-        print("No prebuilt BM25 found; BM25 will be built lazily if needed")
+
+if BM25 is None:
+    if BM25_PERSISTENT:
+        # Stale or missing index: rebuild from the papers
+        build_bm25_index()
+    elif N_PAPERS:
+        print("WARNING: no BM25 index and the code directory is read-only, so one built here would be "
+              "rebuilt on every cold start; set BM25_URL to a prebuilt index. Search is unranked until then.")
+
+def frozen(array: np.ndarray) -> np.ndarray:
+    array.flags.writeable = False
+    return array
+
+if bm25_accumulate is not None:
+    # Compile at import so the first request does not pay the JIT cost. Index
+    # arrays are always read-only (memory-mapped, or frozen after a build),
+    # which Numba types separately, so warm up with read-only arrays too.
+    # This runs after the index build because it starts Numba's thread pool,
+    # and tokenize_corpus() must fork its workers before that (forking a
+    # process with a running TBB pool hangs it at exit).
+    try:
+        bm25_accumulate(
+            np.zeros(1, dtype=np.float32), np.zeros(1, dtype=np.int64), np.ones(1, dtype=np.float32),
+            frozen(np.array([0, 1], dtype=np.int64)), frozen(np.zeros(1, dtype=np.int32)),
+            frozen(np.ones(1, dtype=np.int16)), frozen(np.ones(1, dtype=np.float32)),
+        )
+    except ValueError as e:
+        # Neither TBB nor OpenMP is installed
+        print(f"Numba has no thread-safe threading layer ({e.args[0].splitlines()[0]}); using NumPy scoring")
+        bm25_accumulate = None
 
 @app.get("/api/search")
 @app.get("/search")
@@ -185,7 +814,7 @@ async def search(
     limit: int = Query(50, ge=1, le=100)
 ):
     """Search papers with filters."""
-    if not PAPERS:
+    if not N_PAPERS:
         return {"results": [], "count": 0, "query": q, "error": "No papers loaded"}
     
     # Convert semantic string to boolean
@@ -193,114 +822,36 @@ async def search(
     expanded_q = expand_query(q) if use_semantic else q
     query_tokens = tokenize(expanded_q)
     
-    # BM25 scoring (use prebuilt DOC_IDS mapping if available)
     if BM25 and query_tokens:
-        scores = BM25.get_scores(query_tokens)
-        scored = [(i, score) for i, score in enumerate(scores)]
-        scored.sort(key=lambda x: x[1], reverse=True)
-        
-        # Get top results
-        results = []
-        for idx, score in scored:
-            if len(results) >= limit:
-                break
-
-            # Map BM25 index -> paper id -> paper object
-            if DOC_IDS:
-                pid = DOC_IDS[idx]
-                paper = PAPERS_BY_ID.get(pid)
-            else:
-                # fallback: assume PAPERS order matches BM25
-                paper = PAPERS[idx] if idx < len(PAPERS) else None
-
-            if not paper:
-                continue
-
-            # Apply filters
-            if category and paper.get('category') != category:
-                continue
-
-            if year_min or year_max:
-                try:
-                    year = int(paper.get('published', '')[:4])
-                    if year_min and year < year_min:
-                        continue
-                    if year_max and year > year_max:
-                        continue
-                except (ValueError, IndexError):
-                    continue
-
-            if author and author.lower() not in paper.get('authors', '').lower():
-                continue
-
-            results.append(paper)
+        # CPU-bound; run off the event loop so concurrent requests overlap
+        # (NumPy and Numba release the GIL while scoring). BM25 ignores term
+        # order, so reordered queries share a cache entry.
+        top = await asyncio.to_thread(
+            rank_rows, tuple(sorted(query_tokens)), category or None, year_min or None, year_max or None,
+            author.lower() if author else None, limit,
+        )
     else:
         # No query tokens, return first N papers
-        results = PAPERS[:limit]
+        top = range(min(limit, N_PAPERS))
     
-    return {
-        "results": results,
-        "count": len(results),
-        "query": expanded_q if semantic else q
-    }
+    # Spliced from per-paper JSON, so FastAPI never re-encodes the papers
+    return json_response(b''.join((
+        b'{"results":[', b','.join(map(paper_json, top)),
+        b'],"count":', b'%d' % len(top),
+        b',"query":', orjson.dumps(expanded_q if semantic else q), b'}',
+    )))
 
 @app.get("/api/stats")
 @app.get("/stats")
 async def stats():
     """Get database statistics."""
-    if not PAPERS:
-        return {"total_papers": 0, "categories": {}, "year_range": [0, 0]}
-    
-    # Count categories
-    categories = {}
-    years = []
-    
-    for paper in PAPERS:
-        cat = paper.get('category')
-        if cat:
-            categories[cat] = categories.get(cat, 0) + 1
-        
-        try:
-            year = int(paper.get('published', '')[:4])
-            years.append(year)
-        except (ValueError, IndexError):
-            pass
-    
-    year_range = [min(years), max(years)] if years else [2000, 2024]
-    
-    return {
-        "total_papers": len(PAPERS),
-        "categories": categories,
-        "year_range": year_range
-    }
+    return json_response(STATS_RESPONSE)
 
 @app.get("/api/facets")
 @app.get("/facets")
 async def facets():
     """Get available filter options."""
-    if not PAPERS:
-        return {"categories": [], "year_range": [2000, 2024]}
-    
-    categories = set()
-    years = []
-    
-    for paper in PAPERS:
-        cat = paper.get('category')
-        if cat:
-            categories.add(cat)
-        
-        try:
-            year = int(paper.get('published', '')[:4])
-            years.append(year)
-        except (ValueError, IndexError):
-            pass
-    
-    year_range = [min(years), max(years)] if years else [2000, 2024]
-    
-    return {
-        "categories": sorted(list(categories)),
-        "year_range": year_range
-    }
+    return json_response(FACETS_RESPONSE)
 
 @app.get("/api/suggestions")
 @app.get("/suggestions")
@@ -315,7 +866,7 @@ async def health():
     """Health check endpoint."""
     return {
         "status": "ok",
-        "papers_loaded": len(PAPERS),
+        "papers_loaded": N_PAPERS,
         "bm25_loaded": BM25 is not None,
         "data_path": str(DATA_PATH),
         "data_exists": DATA_PATH.exists()
@@ -4,6 +4,12 @@ import sqlite3
 import json
 import gzip
 from pathlib import Path
+try:
+    import orjson
+    dumps = orjson.dumps
+except ImportError:  # stdlib fallback, same compact UTF-8 output
+    def dumps(obj) -> bytes:
+        return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
 
 REPO_ROOT = Path(__file__).resolve().parent
 DB_SOURCE = REPO_ROOT / "papers.db"
@@ -23,52 +29,52 @@ c = conn.cursor()
 total = c.execute("SELECT COUNT(*) FROM papers").fetchone()[0]
 print(f"Found {total} papers in database")
 
-# Export all papers with all fields
-papers = []
+# Export all papers with all fields. Rows are streamed from the cursor and
+# each paper is encoded and written to both outputs as it arrives, so memory
+# stays flat no matter how many papers there are.
 rows = c.execute("""
     SELECT paper_id, title, authors, abstract, published, updated, 
            categories, primary_category, url, pdf_url
     FROM papers 
     ORDER BY paper_id
-""").fetchall()
+""")
 
-print(f"Processing {len(rows)} papers...")
-for i, row in enumerate(rows):
-    if (i + 1) % 10000 == 0:
-        print(f"  Processed {i + 1}/{len(rows)} papers...")
-    
-    papers.append({
-        "id": row[0],
-        "paper_id": row[0],  # Include both for compatibility
-        "title": row[1] or "",
-        "authors": row[2] or "",
-        "abstract": row[3] or "",
-        "published": row[4] or "",
-        "updated": row[5] or "",
-        "categories": row[6] or "",
-        "category": row[7] or "",
-        "primary_category": row[7] or "",
-        "url": row[8] or "",
-        "pdf_url": row[9] or ""
-    })
+print(f"Writing to {JSON_DEST} and {JSON_COMPRESSED}...")
+count = 0
+with open(JSON_DEST, 'wb') as f_json, gzip.open(JSON_COMPRESSED, 'wb', compresslevel=6) as f_gz:
+    def write(chunk: bytes):
+        f_json.write(chunk)
+        f_gz.write(chunk)
 
-conn.close()
+    write(b'[')
+    for row in rows:
+        if count:
+            write(b',')
+        write(dumps({
+            "id": row[0],
+            "paper_id": row[0],  # Include both for compatibility
+            "title": row[1] or "",
+            "authors": row[2] or "",
+            "abstract": row[3] or "",
+            "published": row[4] or "",
+            "updated": row[5] or "",
+            "categories": row[6] or "",
+            "category": row[7] or "",
+            "primary_category": row[7] or "",
+            "url": row[8] or "",
+            "pdf_url": row[9] or ""
+        }))
+        count += 1
+        if count % 10000 == 0:
+            print(f"  Processed {count}/{total} papers...")
+    write(b']')
 
-# Write uncompressed JSON (for local use)
-print(f"Writing to {JSON_DEST}...")
-with open(JSON_DEST, 'w', encoding='utf-8') as f:
-    json.dump(papers, f, ensure_ascii=False, separators=(',', ':'))  # Compact format
+conn.close()
 
 file_size_mb = JSON_DEST.stat().st_size / (1024 * 1024)
-print(f"Exported {len(papers)} papers to {JSON_DEST}")
+print(f"Exported {count} papers to {JSON_DEST}")
 print(f"Uncompressed file size: {file_size_mb:.2f} MB")
 
-# Also create compressed version for upload
-print(f"Creating compressed version...")
-with open(JSON_DEST, 'rb') as f_in:
-    with gzip.open(JSON_COMPRESSED, 'wb') as f_out:
-        f_out.writelines(f_in)
-
 compressed_size_mb = JSON_COMPRESSED.stat().st_size / (1024 * 1024)
 print(f"Compressed file size: {compressed_size_mb:.2f} MB")
 print(f"Compression ratio: {compressed_size_mb/file_size_mb:.2%}")
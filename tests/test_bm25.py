@@ -0,0 +1,88 @@
+"""Randomized checks of the BM25 index against its exhaustive scoring.
+
+Runs under pytest or ``python -m unittest discover tests``. Importing the API
+without api/papers_data.json loads no papers and builds no index.
+"""
+import random
+import sys
+import unittest
+from collections import Counter
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'api'))
+import index  # noqa: E402
+
+SCORERS = {'numpy': None}
+if index.bm25_accumulate is not None:
+    SCORERS['numba'] = index.bm25_accumulate
+
+
+def random_corpus(rng: random.Random, n_docs: int, n_words: int = 60, max_len: int = 25) -> list[tuple[str, ...]]:
+    """Documents over a small, skewed vocabulary, so scores often (nearly) tie."""
+    words = [f"w{i}" for i in range(rng.randint(1, n_words))]
+    weights = [1 / (i + 1) for i in range(len(words))]
+    return [tuple(rng.choices(words, weights, k=rng.randint(0, max_len))) for _ in range(n_docs)]
+
+
+def random_query(rng: random.Random, corpus: list[tuple[str, ...]]) -> Counter:
+    tokens = [t for doc in rng.sample(corpus, min(3, len(corpus))) for t in doc]
+    query = rng.sample(tokens, min(rng.randint(1, 6), len(tokens)))
+    return Counter(query + rng.choices(['unindexed', *query], k=rng.randint(0, 2)))
+
+
+class TopKTest(unittest.TestCase):
+    # (corpora, max docs, vocabulary, max doc length): many small corpora for
+    # edge cases, and large dense ones whose scores differ in the last float32 bits
+    SHAPES = [(60, 300, 60, 25), (30, 2000, 20, 80)]
+
+    def test_top_k_matches_exhaustive_ranking(self):
+        for name, kernel in SCORERS.items():
+            rng = random.Random(0)
+            with self.subTest(scorer=name), mock.patch.object(index, 'bm25_accumulate', kernel):
+                for n_corpora, max_docs, n_words, max_len in self.SHAPES:
+                    for _ in range(n_corpora):
+                        self.check_corpus(rng, random_corpus(rng, rng.randint(1, max_docs), n_words, max_len))
+
+    def check_corpus(self, rng: random.Random, corpus: list[tuple[str, ...]]):
+        bm25 = index.BM25Index(corpus)
+        for _ in range(20):
+            query = random_query(rng, corpus)
+            k = rng.choice([1, 2, 5, 10, 50, len(corpus) + 1])
+            expected = index.top_k_indices(bm25.get_scores(query), k)
+            self.assertEqual(bm25.get_top_k(query, k).tolist(), expected.tolist(), (query, k))
+
+
+class ExtendTest(unittest.TestCase):
+    def assertSameIndex(self, actual: index.BM25Index, expected: index.BM25Index):
+        self.assertEqual(actual.vocab, expected.vocab)
+        self.assertEqual(actual.n_docs, expected.n_docs)
+        for name in index.BM25Index.ARRAYS:
+            a, e = getattr(actual, name), getattr(expected, name)
+            self.assertEqual(a.dtype, e.dtype, name)
+            np.testing.assert_array_equal(a, e, err_msg=name)
+
+    def test_extended_matches_fresh_build(self):
+        rng = random.Random(1)
+        for _ in range(100):
+            corpus = random_corpus(rng, rng.randint(0, 200))
+            split = rng.randint(0, len(corpus))
+            extended = index.BM25Index(corpus[:split]).extended(corpus[split:])
+            self.assertSameIndex(extended, index.BM25Index(corpus))
+
+    def test_repeated_documents_match_their_tokens(self):
+        rng = random.Random(2)
+        for _ in range(50):
+            corpus = random_corpus(rng, rng.randint(1, 100))
+            # A repeat is given as the position of its earlier copy
+            repeats = [rng.randrange(i) if i and rng.random() < 0.3 else doc for i, doc in enumerate(corpus)]
+            expanded = []
+            for doc in repeats:
+                expanded.append(expanded[doc] if isinstance(doc, int) else doc)
+            self.assertSameIndex(index.BM25Index(repeats), index.BM25Index(expanded))
+
+
+if __name__ == '__main__':
+    unittest.main()